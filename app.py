@@ -1,15 +1,18 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
 import time
 import os
 import io
-import zipfile
-from pathlib import Path
+import stat
+import hashlib
+import functools
 import tempfile
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from streamlit.runtime.uploaded_file_manager import UploadedFile
 
 # ------------------------------------
 # Page Configuration
@@ -121,139 +124,668 @@ def load_css():
 # ------------------------------------
 # File Processing Functions
 # ------------------------------------
+def hash_uploaded_file(uploaded_file):
+    """Cache key for uploads: Streamlit's file_id, unique to each upload"""
+    # A prefix of the content can't tell apart edits past it, and the cache is shared by all sessions
+    return uploaded_file.file_id
+
+# Loaded DataFrames are cached as resources so reruns skip the pickle round-trip;
+# callers must treat them as read-only
+cache_upload = st.cache_resource(
+    show_spinner=False,
+    max_entries=4,
+    ttl=3600,
+    hash_funcs={UploadedFile: hash_uploaded_file}
+)
+cache_analysis = st.cache_data(show_spinner=False, max_entries=4, ttl=3600)
+
+PARQUET_CACHE_DIR = Path(tempfile.gettempdir()) / "aegis_cache"
+PARQUET_CACHE_MAX_BYTES = 1024**3
+PARQUET_CACHE_MAX_AGE = 24 * 3600
+
+@functools.lru_cache(maxsize=None)
+def parquet_cache_dir():
+    """Private snapshot directory, or None if it can't be trusted"""
+    try:
+        PARQUET_CACHE_DIR.mkdir(mode=0o700, exist_ok=True)
+        info = os.lstat(PARQUET_CACHE_DIR)
+        # Another local user could pre-create the directory to read or plant snapshots
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+            return None
+        if info.st_mode & 0o077:
+            # Ours but created with looser permissions; only we could have written to it
+            os.chmod(PARQUET_CACHE_DIR, 0o700)
+    except OSError:
+        return None
+    return PARQUET_CACHE_DIR
+
+def parquet_snapshot_path(uploaded_file, *args):
+    """Location of the Parquet snapshot for an upload, keyed by content hash; None if disabled"""
+    cache_dir = parquet_cache_dir()
+    if cache_dir is None:
+        return None
+    hasher = hashlib.sha1(uploaded_file.getvalue())
+    # Loader options such as the Excel sheet change the parsed result
+    hasher.update(repr(args).encode())
+    digest = hasher.hexdigest()
+    return cache_dir / f"{digest}.parquet"
+
+def prune_parquet_cache(cache_dir):
+    """Drop snapshots past the age limit, then the least recently used until under the size cap"""
+    entries = []
+    for path in cache_dir.glob("*.parquet"):
+        try:
+            info = path.stat()
+        except OSError:
+            continue
+        entries.append((info.st_mtime, info.st_size, path))
+    
+    now = time.time()
+    total = sum(size for _, size, _ in entries)
+    # Oldest first; reads refresh the mtime, so this is least recently used
+    for mtime, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if now - mtime <= PARQUET_CACHE_MAX_AGE and total <= PARQUET_CACHE_MAX_BYTES:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+
+def save_parquet_snapshot(df, path):
+    """Write a Parquet snapshot, replacing any partial file atomically"""
+    tmp_path = path.with_suffix('.tmp')
+    df.to_parquet(tmp_path, compression='zstd', compression_level=3)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+    prune_parquet_cache(path.parent)
+
+def with_parquet_snapshot(loader):
+    """Serve repeat uploads from a Parquet snapshot instead of re-parsing them"""
+    @functools.wraps(loader)
+    def wrapper(uploaded_file, *args):
+        path = parquet_snapshot_path(uploaded_file, *args)
+        if path is None:
+            return loader(uploaded_file, *args)
+        
+        if path.exists():
+            try:
+                df = pd.read_parquet(path)
+                # Mark as recently used for prune_parquet_cache
+                os.utime(path)
+                return df, f"✅ Loaded from cached snapshot: {len(df)} rows, {len(df.columns)} columns"
+            except Exception:
+                # Corrupt or unreadable snapshot; parse the upload again
+                pass
+        
+        df, message = loader(uploaded_file, *args)
+        if df is not None:
+            try:
+                save_parquet_snapshot(df, path)
+            except Exception:
+                # Mixed-type object columns can't be written to Parquet; skip the snapshot
+                pass
+        return df, message
+    return wrapper
+
+def upload_buffer(uploaded_file):
+    """Seekable view over the upload's bytes, rewound between parse attempts"""
+    # BytesIO over an existing bytes object shares the buffer instead of copying it
+    return io.BytesIO(uploaded_file.getvalue())
+
+CSV_CHUNK_SIZE = 200_000
+
+def shrink_dtypes(df):
+    """Downcast numeric columns to the smallest dtype that holds their values"""
+    df = df.convert_dtypes()
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes('float').columns:
+        down = pd.to_numeric(df[col], downcast='float')
+        # float32 keeps only ~7 significant digits, so only take it when every value survives the trip
+        if (down.astype('Float64') == df[col]).all():
+            df[col] = down
+    return df
+
+def categorize_strings(df, max_ratio=0.5):
+    """Convert low-cardinality text columns to category"""
+    if len(df) == 0:
+        return df
+    for col in df.columns:
+        if not pd.api.types.is_string_dtype(df[col]):
+            continue
+        if df[col].nunique() / len(df) < max_ratio:
+            df[col] = df[col].astype('category')
+    return df
+
+def read_csv_chunked(source):
+    """Read a CSV in chunks, downcasting each chunk before concatenating"""
+    reader = pd.read_csv(source, chunksize=CSV_CHUNK_SIZE, low_memory=True)
+    parts = [shrink_dtypes(chunk) for chunk in reader]
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True, copy=False)
+    # Category detection runs on the full frame so categories stay consistent
+    return categorize_strings(df)
+
+def mangle_column_names(names):
+    """Rename empty and repeated headers the way pandas.read_csv does ('Unnamed: 0', 'val.1')"""
+    unnamed = [i for i, name in enumerate(names) if not name]
+    names = [name if name else f"Unnamed: {i}" for i, name in enumerate(names)]
+    taken = set(names)
+    counts = {}
+    # Given names keep priority over generated ones, as in pandas' C parser
+    for i in [i for i in range(len(names)) if i not in unnamed] + unnamed:
+        name = original = names[i]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in taken else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+def read_csv_arrow(source):
+    """Read a CSV with pyarrow's multi-threaded reader into Arrow-backed columns"""
+    from pyarrow import csv as pacsv
+    table = pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(block_size=8 << 20, use_threads=True)
+    )
+    # pyarrow keeps duplicate and empty headers as-is; the rest of the app needs unique names
+    table = table.rename_columns(mangle_column_names(table.column_names))
+    df = table.to_pandas(types_mapper=pd.ArrowDtype, split_blocks=True, self_destruct=True)
+    return categorize_strings(df)
+
+def load_csv(source):
+    """Read a CSV with pyarrow when available, falling back to the chunked pandas reader"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return read_csv_chunked(source)
+    
+    try:
+        return read_csv_arrow(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return read_csv_chunked(source)
+
+@cache_upload
+@with_parquet_snapshot
 def process_csv_file(uploaded_file):
     """Process CSV file and return DataFrame"""
     try:
-        df = pd.read_csv(uploaded_file)
+        df = load_csv(upload_buffer(uploaded_file))
         return df, f"✅ CSV file loaded successfully: {len(df)} rows, {len(df.columns)} columns"
     except Exception as e:
         return None, f"❌ Error loading CSV: {str(e)}"
 
+def read_xpt_readstat(source):
+    """Read a SAS transport file with pyreadstat (ReadStat C library)"""
+    import pyreadstat
+    # ReadStat only reads from a path, so spill the bytes to disk once
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.xpt') as tmp:
+        tmp.write(source.getvalue())
+    try:
+        df, meta = pyreadstat.read_xport(tmp.name, disable_datetime_conversion=True)
+    finally:
+        os.remove(tmp.name)
+    df.attrs['column_labels'] = meta.column_names_to_labels
+    return df
+
+@cache_upload
+@with_parquet_snapshot
 def process_xpt_file(uploaded_file):
     """Process XPT file and return DataFrame"""
     try:
         # For XPT files (SAS transport files)
+        buf = upload_buffer(uploaded_file)
         try:
-            import xport
-            df = xport.to_dataframe(uploaded_file)
-        except:
-            # Fallback: try with pandas if xport not available
-            st.warning("XPT processing limited - install 'xport' package for better support")
-            df = pd.read_sas(uploaded_file, format='xport')
+            df = read_xpt_readstat(buf)
+        except ImportError:
+            try:
+                import xport
+                df = xport.to_dataframe(buf)
+            except:
+                # Fallback: try with pandas if xport not available
+                st.warning("XPT processing limited - install 'pyreadstat' package for better support")
+                buf.seek(0)
+                df = pd.read_sas(buf, format='xport')
         return df, f"✅ XPT file loaded successfully: {len(df)} rows, {len(df.columns)} columns"
     except Exception as e:
         return None, f"❌ Error loading XPT: {str(e)}"
 
-def process_excel_file(uploaded_file):
+def read_excel_sheet(source, sheet_name=0):
+    """Read a single worksheet, preferring the calamine (Rust) engine over openpyxl"""
+    try:
+        return pd.read_excel(source, sheet_name=sheet_name, engine='calamine')
+    except (ImportError, ValueError):
+        # python-calamine missing or pandas too old for the engine
+        source.seek(0)
+        return pd.read_excel(source, sheet_name=sheet_name)
+
+@cache_upload
+def excel_sheet_names(uploaded_file):
+    """List worksheet names without materializing any sheet"""
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        CalamineWorkbook = None
+    
+    # Corrupt workbooks raise from either reader; the loader reports the error
+    try:
+        if CalamineWorkbook is not None:
+            return CalamineWorkbook.from_filelike(uploaded_file).sheet_names
+        return pd.ExcelFile(uploaded_file).sheet_names
+    except Exception:
+        return []
+
+@cache_upload
+@with_parquet_snapshot
+def process_excel_file(uploaded_file, sheet_name=0):
     """Process Excel file and return DataFrame"""
     try:
-        df = pd.read_excel(uploaded_file)
+        df = read_excel_sheet(upload_buffer(uploaded_file), sheet_name)
         return df, f"✅ Excel file loaded successfully: {len(df)} rows, {len(df.columns)} columns"
     except Exception as e:
         return None, f"❌ Error loading Excel: {str(e)}"
 
+def read_zip_member(zip_ref, info):
+    """Parse a single ZIP member straight from the archive stream"""
+    file_name = info.filename.lower()
+    if file_name.endswith('.csv'):
+        with zip_ref.open(info) as member:
+            return load_csv(member)
+    elif file_name.endswith('.xpt'):
+        buf = io.BytesIO(zip_ref.read(info))
+        try:
+            return read_xpt_readstat(buf)
+        except ImportError:
+            return pd.read_sas(buf, format='xport')
+    else:
+        # openpyxl needs a seekable buffer
+        return read_excel_sheet(io.BytesIO(zip_ref.read(info)))
+
+def iter_zip_members(zip_ref):
+    """Yield (info, dataframe, error) for each file member of an open ZIP archive"""
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+        
+        df, error = None, None
+        # Try to read as DataFrame if it's a supported file type
+        if info.filename.lower().endswith(('.csv', '.xpt', '.xlsx', '.xls')):
+            try:
+                df = read_zip_member(zip_ref, info)
+            except Exception as e:
+                error = str(e)
+        
+        yield info, df, error
+
+@cache_upload
 def process_zip_folder(uploaded_file):
-    """Process ZIP folder containing multiple files"""
-    extracted_files = []
+    """Process ZIP folder into a per-file summary table and loaded DataFrames keyed by path"""
+    import zipfile
+    
+    names, sizes, rows, columns, statuses = [], [], [], [], []
+    dataframes = {}
     try:
         with zipfile.ZipFile(uploaded_file, 'r') as zip_ref:
-            # Create temporary directory
-            with tempfile.TemporaryDirectory() as temp_dir:
-                zip_ref.extractall(temp_dir)
-                
-                # Process all files in the extracted folder
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        file_info = {
-                            'name': file,
-                            'path': file_path,
-                            'size': os.path.getsize(file_path)
-                        }
-                        
-                        # Try to read as DataFrame if it's a supported file type
-                        if file.lower().endswith(('.csv', '.xpt', '.xlsx', '.xls')):
-                            try:
-                                if file.lower().endswith('.csv'):
-                                    df = pd.read_csv(file_path)
-                                elif file.lower().endswith('.xpt'):
-                                    df = pd.read_sas(file_path, format='xport')
-                                else:
-                                    df = pd.read_excel(file_path)
-                                file_info['dataframe'] = df
-                                file_info['rows'] = len(df)
-                                file_info['columns'] = len(df.columns)
-                            except Exception as e:
-                                file_info['error'] = str(e)
-                        
-                        extracted_files.append(file_info)
+            for info, df, error in iter_zip_members(zip_ref):
+                names.append(info.filename)
+                sizes.append(info.file_size)
+                rows.append(len(df) if df is not None else None)
+                columns.append(len(df.columns) if df is not None else None)
+                if df is not None:
+                    dataframes[info.filename] = df
+                    statuses.append("✅ Loaded")
+                elif error is not None:
+                    statuses.append(f"❌ Load failed: {error}")
+                else:
+                    statuses.append("")
         
-        return extracted_files, f"✅ ZIP folder processed: {len(extracted_files)} files extracted"
+        files_df = pd.DataFrame({
+            'File': names,
+            'Size (bytes)': sizes,
+            'Rows': pd.array(rows, dtype='Int64'),
+            'Columns': pd.array(columns, dtype='Int64'),
+            'Status': statuses
+        })
+        return (files_df, dataframes), f"✅ ZIP folder processed: {len(files_df)} files extracted"
     except Exception as e:
         return None, f"❌ Error processing ZIP folder: {str(e)}"
 
-def analyze_dataframe(df, dataset_name=""):
+def dataset_key(uploaded_file, *parts):
+    """Cache key for a loaded dataset: the upload's file_id plus its sheet or ZIP member"""
+    # Object ids are reused once a frame is freed, so only the source identifies the data
+    return (uploaded_file.file_id, *parts)
+
+def text_columns(df):
+    """Object, category and string columns, including pandas and Arrow-backed string dtypes"""
+    return [
+        col for col, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype)
+    ]
+
+def holds_python_objects(dtype):
+    """True when values are stored as Python objects, which shallow memory_usage doesn't count"""
+    return dtype == object or (isinstance(dtype, pd.StringDtype) and dtype.storage == 'python')
+
+def estimate_memory(df):
+    """Approximate in-memory size without deep-inspecting every object"""
+    total = int(df.memory_usage(deep=False).sum())
+    # Arrow-backed strings already report their buffers; only Python-object storage needs adding
+    for col in [col for col, dtype in df.dtypes.items() if holds_python_objects(dtype)]:
+        try:
+            total += int(df[col].str.len().sum())
+        except AttributeError:
+            # Not a text column; fall back to a deep scan for this one only
+            total += int(df[col].memory_usage(deep=True, index=False))
+    return total
+
+def count_duplicates(df):
+    """Count duplicate rows from vectorized 64-bit row hashes"""
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    except TypeError:
+        # Unhashable cell values (lists, dicts); use pandas' row comparison
+        return df.duplicated().sum()
+    return hashes.size - np.unique(hashes).size
+
+def column_stats_numpy(a):
+    """Missing count, min, max, mean and sample std per column"""
+    with warnings.catch_warnings():
+        # All-NaN columns legitimately produce NaN here
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return (
+            np.isnan(a).sum(axis=0),
+            np.nanmin(a, axis=0),
+            np.nanmax(a, axis=0),
+            np.nanmean(a, axis=0),
+            np.nanstd(a, axis=0, ddof=1)
+        )
+
+@functools.lru_cache(maxsize=None)
+def column_stats_kernel():
+    """Compile the parallel Numba column_stats kernel on first use"""
+    try:
+        import numba
+        from numba import njit, prange
+    except ImportError:
+        return column_stats_numpy
+    
+    # Prefer OpenMP: TBB's worker pool can block interpreter exit when kernels
+    # are launched from Streamlit's script threads
+    numba.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+    
+    @njit(parallel=True, cache=True)
+    def column_stats(a):
+        """Missing count, min, max, mean and sample std per column in one parallel pass"""
+        n, k = a.shape
+        miss = np.zeros(k, np.int64)
+        mn = np.full(k, np.nan)
+        mx = np.full(k, np.nan)
+        mean = np.full(k, np.nan)
+        std = np.full(k, np.nan)
+        for j in prange(k):
+            count = 0
+            m = 0.0
+            m2 = 0.0
+            lo = np.inf
+            hi = -np.inf
+            for i in range(n):
+                x = a[i, j]
+                if np.isnan(x):
+                    miss[j] += 1
+                    continue
+                # Welford update keeps the variance stable in a single pass
+                count += 1
+                delta = x - m
+                m += delta / count
+                m2 += delta * (x - m)
+                lo = min(lo, x)
+                hi = max(hi, x)
+            if count > 0:
+                mn[j] = lo
+                mx[j] = hi
+                mean[j] = m
+            if count > 1:
+                std[j] = np.sqrt(m2 / (count - 1))
+        return miss, mn, mx, mean, std
+    
+    return column_stats
+
+def describe_numeric(numeric):
+    """Numeric describe() built from one column_stats pass plus quantiles"""
+    index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    if len(numeric) == 0:
+        desc = pd.DataFrame(np.nan, index=index, columns=numeric.columns)
+        desc.loc['count'] = 0
+        return desc
+    
+    # Column-major so each column is a contiguous scan
+    a = np.asfortranarray(numeric.to_numpy(dtype=np.float64, na_value=np.nan))
+    miss, mn, mx, mean, std = column_stats_kernel()(a)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        q25, q50, q75 = np.nanquantile(a, [0.25, 0.5, 0.75], axis=0)
+    return pd.DataFrame(
+        [len(a) - miss, mean, std, mn, q25, q50, q75, mx],
+        index=index,
+        columns=numeric.columns
+    )
+
+DESCRIBE_SAMPLE_SIZE = 100_000
+DESCRIBE_ROW_ORDER = ['count', 'unique', 'top', 'freq', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+def describe_frame(df):
+    """describe(include='all') with non-numeric columns summarized from a row sample"""
+    numeric = df.select_dtypes(include=[np.number])
+    other = df.select_dtypes(exclude=[np.number])
+    if len(other) > DESCRIBE_SAMPLE_SIZE:
+        other_sample = other.sample(DESCRIBE_SAMPLE_SIZE, random_state=0)
+    else:
+        other_sample = other
+    
+    parts = []
+    # Both halves spend most of their time in compiled code, so they overlap
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = []
+        if len(numeric.columns) > 0:
+            futures.append(executor.submit(describe_numeric, numeric))
+        if len(other.columns) > 0:
+            futures.append(executor.submit(other_sample.describe, include='all'))
+        parts = [future.result() for future in futures]
+    
+    if not parts:
+        return pd.DataFrame()
+    if len(other.columns) > 0:
+        # Report true non-null counts rather than the sample's
+        parts[-1].loc['count'] = other.count()
+    
+    desc = pd.concat(parts, axis=1)
+    rows = [row for row in DESCRIBE_ROW_ORDER if row in desc.index]
+    rows += [row for row in desc.index if row not in rows]
+    return desc.reindex(index=rows, columns=df.columns)
+
+@cache_analysis
+def frame_memory(df_key, _df):
+    """Memory estimate for a DataFrame, computed once per dataset"""
+    return estimate_memory(_df)
+
+@cache_analysis
+def frame_stats(df_key, _df):
+    """Full-table scans for a DataFrame, computed once per dataset"""
+    desc = describe_frame(_df)
+    if 'count' in desc.index:
+        # describe already counted non-null values in every column
+        missing = (len(_df) - pd.to_numeric(desc.loc['count'])).astype('int64')
+    else:
+        missing = _df.isnull().sum()
+    return {
+        'mem': frame_memory(df_key, _df),
+        'dup': count_duplicates(_df),
+        'missing': missing,
+        'miss': missing.sum(),
+        'dtypes': _df.dtypes.astype(str).to_dict(),
+        'desc': desc
+    }
+
+def fast_corr(df):
+    """Pearson correlation computed with float32 matrix products over centered columns"""
+    X = df.to_numpy(dtype=np.float32, na_value=np.nan)
+    mask = ~np.isnan(X)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(mask, X, 0).sum(axis=0) / mask.sum(axis=0)
+        Xc = np.where(mask, X - mean, 0).astype(np.float32)
+        
+        if mask.all():
+            Xn = Xc / np.sqrt((Xc * Xc).sum(axis=0))
+            try:
+                from scipy.linalg.blas import ssyrk
+                # Symmetric rank-k update only fills the upper triangle
+                upper = ssyrk(alpha=1.0, a=Xn, trans=1)
+                corr = np.triu(upper) + np.triu(upper, 1).T
+            except ImportError:
+                corr = Xn.T @ Xn
+        else:
+            # Pairwise-complete correlation, matching DataFrame.corr
+            M = mask.astype(np.float32)
+            n = M.T @ M
+            sx = Xc.T @ M
+            sxx = (Xc * Xc).T @ M
+            cov = Xc.T @ Xc - sx * sx.T / n
+            var = sxx - sx * sx / n
+            corr = cov / np.sqrt(var * var.T)
+    
+    return pd.DataFrame(corr, index=df.columns, columns=df.columns)
+
+@cache_analysis
+def analyze_dataframe(df_key, _df, dataset_name=""):
     """Perform comprehensive analysis on DataFrame"""
     analysis = {}
+    stats = frame_stats(df_key, _df)
     
     # Basic Information
     analysis['basic_info'] = {
         'Dataset Name': dataset_name,
-        'Shape': f"{df.shape[0]} rows × {df.shape[1]} columns",
-        'Memory Usage': f"{df.memory_usage(deep=True).sum() / 1024**2:.2f} MB",
-        'Duplicate Rows': df.duplicated().sum(),
-        'Total Missing Values': df.isnull().sum().sum()
+        'Shape': f"{_df.shape[0]} rows × {_df.shape[1]} columns",
+        'Memory Usage': f"{stats['mem'] / 1024**2:.2f} MB",
+        'Duplicate Rows': stats['dup'],
+        'Total Missing Values': stats['miss']
     }
     
     # Data Types
-    analysis['dtypes'] = df.dtypes.astype(str).to_dict()
+    analysis['dtypes'] = stats['dtypes']
     
     # Descriptive Statistics
-    analysis['descriptive_stats'] = df.describe(include='all')
+    analysis['descriptive_stats'] = stats['desc']
     
     # Missing Values Analysis
-    missing_data = df.isnull().sum()
-    missing_percent = (missing_data / len(df)) * 100
+    missing_data = stats['missing']
+    missing_percent = (missing_data / len(_df)) * 100
     analysis['missing_values'] = pd.DataFrame({
         'Missing Count': missing_data,
         'Missing Percentage': missing_percent
     }).sort_values('Missing Count', ascending=False)
     
     # Correlation Analysis (for numeric columns)
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    numeric_cols = _df.select_dtypes(include=[np.number]).columns
     if len(numeric_cols) > 1:
-        analysis['correlation'] = df[numeric_cols].corr()
+        analysis['correlation'] = fast_corr(_df[numeric_cols])
     
     return analysis
 
-def create_visualizations(df, dataset_name=""):
+MAX_HEATMAP_COLUMNS = 200
+
+def heatmap_matrix(corr_matrix, max_columns=MAX_HEATMAP_COLUMNS):
+    """Limit a correlation matrix to a size the browser can render"""
+    if len(corr_matrix.columns) <= max_columns:
+        return corr_matrix
+    
+    try:
+        from scipy.cluster.hierarchy import leaves_list, linkage
+        from scipy.spatial.distance import squareform
+        # Cluster so the kept slice shows correlated blocks side by side
+        distance = 1 - np.abs(np.nan_to_num(corr_matrix.to_numpy(), nan=0.0))
+        np.fill_diagonal(distance, 0)
+        order = leaves_list(linkage(squareform(distance, checks=False), method='average'))
+    except ImportError:
+        order = np.arange(len(corr_matrix.columns))
+    
+    keep = order[:max_columns]
+    return corr_matrix.iloc[keep, keep]
+
+def histogram_figure(series, title, bins=50):
+    """Bin a numeric column on the server and plot only the bin counts"""
+    import plotly.graph_objects as go
+    
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(title=title, xaxis_title=series.name, yaxis_title="count", bargap=0)
+    return fig
+
+@cache_analysis
+def create_visualizations(df_key, _df, dataset_name=""):
     """Create automated visualizations based on data types"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     visualizations = []
     
     # Numeric columns histogram
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    numeric_cols = _df.select_dtypes(include=[np.number]).columns
     if len(numeric_cols) > 0:
         for col in numeric_cols[:3]:  # Show first 3 numeric columns
-            fig = px.histogram(df, x=col, title=f"Distribution of {col}")
+            fig = histogram_figure(_df[col], f"Distribution of {col}")
             visualizations.append(fig)
     
     # Categorical columns bar chart
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+    categorical_cols = text_columns(_df)
     if len(categorical_cols) > 0:
         for col in categorical_cols[:2]:  # Show first 2 categorical columns
-            value_counts = df[col].value_counts().head(10)
-            fig = px.bar(x=value_counts.index, y=value_counts.values, 
-                        title=f"Top Values in {col}")
+            value_counts = _df[col].value_counts().head(10)
+            fig = go.Figure(go.Bar(x=value_counts.index.astype(str), y=value_counts.values))
+            fig.update_layout(title=f"Top Values in {col}")
             visualizations.append(fig)
     
     # Correlation heatmap if enough numeric columns
     if len(numeric_cols) >= 3:
-        corr_matrix = df[numeric_cols].corr()
+        corr_matrix = heatmap_matrix(fast_corr(_df[numeric_cols]))
         fig = px.imshow(corr_matrix, title="Correlation Heatmap")
         visualizations.append(fig)
     
     return visualizations
 
+def to_csv_bytes(df, index=False):
+    """Serialize a DataFrame to CSV directly into a bytes buffer"""
+    buf = io.BytesIO()
+    df.to_csv(buf, index=index, encoding='utf-8')
+    return buf.getvalue()
+
+def to_parquet_bytes(df):
+    """Serialize a DataFrame to zstd-compressed Parquet bytes"""
+    buf = io.BytesIO()
+    df.to_parquet(buf, compression='zstd')
+    return buf.getvalue()
+
+@cache_analysis
+def export_csv(df_key, _df):
+    """CSV export bytes, serialized once per dataset"""
+    return to_csv_bytes(_df)
+
+@cache_analysis
+def export_parquet(df_key, _df):
+    """Parquet export bytes, serialized once per dataset; None if not serializable"""
+    try:
+        return to_parquet_bytes(_df)
+    except Exception:
+        return None
+
 # ------------------------------------
 # Authentication (Demo)
 # ------------------------------------
@@ -295,6 +827,156 @@ def check_authentication():
             st.stop()
     return True
 
+# ------------------------------------
+# Data Analysis Fragments
+# ------------------------------------
+PREVIEW_ROWS = 100
+PREVIEW_COLUMNS = 40
+
+def preview_table(df, columns):
+    """First rows of the selected columns as an Arrow table with dictionary-encoded strings"""
+    preview = df[columns].head(PREVIEW_ROWS).reset_index(drop=True)
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return preview
+    
+    # Hand Streamlit an Arrow table so it skips its own conversion
+    try:
+        table = pa.Table.from_pandas(preview, preserve_index=False).combine_chunks()
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns; Streamlit's own conversion fixes them up
+        return preview
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+    return table
+
+# Each section reruns on its own when its widgets change, instead of the whole page
+@st.fragment
+def show_data_preview(df, df_key):
+    """Preview table and size metrics for the loaded dataset"""
+    st.subheader("👀 Data Preview")
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        columns = list(df.columns[:PREVIEW_COLUMNS])
+        if len(df.columns) > PREVIEW_COLUMNS:
+            columns += st.multiselect(
+                f"Showing the first {PREVIEW_COLUMNS} columns - add more:",
+                options=list(df.columns[PREVIEW_COLUMNS:])
+            )
+        st.dataframe(preview_table(df, columns), use_container_width=True)
+    
+    with col2:
+        st.metric("Total Rows", f"{len(df):,}")
+        st.metric("Total Columns", f"{len(df.columns):,}")
+        st.metric("Memory", f"{frame_memory(df_key, df) / 1024**2:.2f} MB")
+
+@st.fragment
+def show_analysis_results(df, df_key):
+    """On-demand comprehensive analysis of the loaded dataset"""
+    import plotly.express as px
+    
+    if st.button("🚀 Perform Comprehensive Analysis", use_container_width=True):
+        with st.spinner("Analyzing data..."):
+            analysis = analyze_dataframe(df_key, df, "Uploaded Dataset")
+            
+            # Display Analysis Results
+            st.subheader("📈 Data Analysis Results")
+            
+            # Basic Information
+            st.markdown("### 📋 Basic Information")
+            info_cols = st.columns(4)
+            basic_info = analysis['basic_info']
+            info_cols[0].metric("Dataset", basic_info['Dataset Name'])
+            info_cols[1].metric("Shape", basic_info['Shape'])
+            info_cols[2].metric("Duplicates", basic_info['Duplicate Rows'])
+            info_cols[3].metric("Missing Values", basic_info['Total Missing Values'])
+            
+            # Data Types
+            st.markdown("### 🔧 Data Types")
+            dtype_df = pd.DataFrame(list(analysis['dtypes'].items()), 
+                                  columns=['Column', 'Data Type'])
+            st.dataframe(dtype_df, use_container_width=True)
+            
+            # Missing Values Analysis
+            st.markdown("### ⚠️ Missing Values Analysis")
+            missing_df = analysis['missing_values']
+            missing_df = missing_df[missing_df['Missing Count'] > 0]
+            if len(missing_df) > 0:
+                fig = px.bar(missing_df.head(10), 
+                           x=missing_df.index, 
+                           y='Missing Count',
+                           title="Top 10 Columns with Missing Values")
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(missing_df, use_container_width=True)
+            else:
+                st.success("🎉 No missing values found in the dataset!")
+            
+            # Descriptive Statistics
+            st.markdown("### 📊 Descriptive Statistics")
+            st.dataframe(analysis['descriptive_stats'], use_container_width=True)
+            st.download_button(
+                "📊 Download Summary Stats",
+                data=to_csv_bytes(analysis['descriptive_stats'], index=True),
+                file_name="summary_statistics.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+            
+            # Correlation Matrix
+            if 'correlation' in analysis:
+                st.markdown("### 🔗 Correlation Matrix")
+                fig = px.imshow(heatmap_matrix(analysis['correlation']),
+                              title="Correlation Heatmap",
+                              color_continuous_scale='RdBu_r',
+                              aspect="auto")
+                st.plotly_chart(fig, use_container_width=True)
+            
+            # Automated Visualizations
+            st.markdown("### 📈 Automated Visualizations")
+            visualizations = create_visualizations(df_key, df)
+            for viz in visualizations:
+                st.plotly_chart(viz, use_container_width=True)
+
+@st.fragment
+def show_export_options(df, df_key):
+    """Download buttons for the loaded dataset"""
+    st.markdown("---")
+    st.subheader("📤 Export Options")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        csv_data = export_csv(df_key, df)
+        st.download_button(
+            "💾 Download as CSV",
+            data=csv_data,
+            file_name="analyzed_data.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+        
+        # Parquet is only serialized on request; keyed per dataset so a new upload starts switched off
+        parquet_data = None
+        if st.toggle("🗜️ Prepare Parquet", key=f"prepare_parquet_{df_key}"):
+            parquet_data = export_parquet(df_key, df)
+            if parquet_data is None:
+                st.warning("This dataset can't be written as Parquet.")
+        if parquet_data is not None:
+            st.download_button(
+                "🗜️ Download as Parquet",
+                data=parquet_data,
+                file_name="analyzed_data.parquet",
+                mime="application/octet-stream",
+                use_container_width=True
+            )
+    
+    with col2:
+        if st.button("🔄 Analyze Another Dataset", use_container_width=True):
+            st.rerun()
+
 # ------------------------------------
 # Data Upload & Analysis Page
 # ------------------------------------
@@ -338,13 +1020,14 @@ def show_data_analysis():
 
     # Process uploaded files
     current_df = None
-    current_analysis = None
+    current_key = None
     
     if uploaded_csv:
         with st.spinner("Processing CSV file..."):
             df, message = process_csv_file(uploaded_csv)
             if df is not None:
                 current_df = df
+                current_key = dataset_key(uploaded_csv)
                 st.success(message)
             else:
                 st.error(message)
@@ -354,151 +1037,52 @@ def show_data_analysis():
             df, message = process_xpt_file(uploaded_xpt)
             if df is not None:
                 current_df = df
+                current_key = dataset_key(uploaded_xpt)
                 st.success(message)
             else:
                 st.error(message)
     
     elif uploaded_excel:
+        # Only the chosen sheet is parsed for multi-sheet workbooks
+        sheet_names = excel_sheet_names(uploaded_excel)
+        sheet_name = 0
+        if len(sheet_names) > 1:
+            sheet_name = st.selectbox("Select sheet to load:", options=sheet_names)
+        
         with st.spinner("Processing Excel file..."):
-            df, message = process_excel_file(uploaded_excel)
+            df, message = process_excel_file(uploaded_excel, sheet_name)
             if df is not None:
                 current_df = df
+                current_key = dataset_key(uploaded_excel, sheet_name)
                 st.success(message)
             else:
                 st.error(message)
     
     elif uploaded_zip:
         with st.spinner("Processing ZIP folder..."):
-            files_info, message = process_zip_folder(uploaded_zip)
-            if files_info is not None:
+            zip_result, message = process_zip_folder(uploaded_zip)
+            if zip_result is not None:
+                files_df, dataframes = zip_result
                 st.success(message)
                 
                 # Display extracted files information
                 st.subheader("📂 Extracted Files")
-                for file_info in files_info:
-                    col1, col2, col3 = st.columns([3, 2, 2])
-                    with col1:
-                        st.write(f"**{file_info['name']}**")
-                    with col2:
-                        st.write(f"Size: {file_info['size']} bytes")
-                    with col3:
-                        if 'dataframe' in file_info:
-                            st.success(f"✅ {file_info['rows']} rows")
-                        elif 'error' in file_info:
-                            st.error("❌ Load failed")
+                st.dataframe(files_df, use_container_width=True, hide_index=True)
                 
                 # Let user select which file to analyze
-                analyzable_files = [f for f in files_info if 'dataframe' in f]
-                if analyzable_files:
+                if dataframes:
                     selected_file = st.selectbox(
                         "Select file to analyze:",
-                        options=[f['name'] for f in analyzable_files]
+                        options=list(dataframes)
                     )
-                    selected_file_info = next(f for f in analyzable_files if f['name'] == selected_file)
-                    current_df = selected_file_info['dataframe']
+                    current_df = dataframes[selected_file]
+                    current_key = dataset_key(uploaded_zip, selected_file)
     
     # Display data and analysis if we have a DataFrame
     if current_df is not None:
-        # Data Preview
-        st.subheader("👀 Data Preview")
-        col1, col2 = st.columns([3, 1])
-        
-        with col1:
-            st.dataframe(current_df.head(100), use_container_width=True)
-        
-        with col2:
-            st.metric("Total Rows", f"{len(current_df):,}")
-            st.metric("Total Columns", f"{len(current_df.columns):,}")
-            st.metric("Memory", f"{current_df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-        
-        # Perform Analysis
-        if st.button("🚀 Perform Comprehensive Analysis", use_container_width=True):
-            with st.spinner("Analyzing data..."):
-                current_analysis = analyze_dataframe(current_df, "Uploaded Dataset")
-                
-                # Display Analysis Results
-                st.subheader("📈 Data Analysis Results")
-                
-                # Basic Information
-                st.markdown("### 📋 Basic Information")
-                info_cols = st.columns(4)
-                basic_info = current_analysis['basic_info']
-                info_cols[0].metric("Dataset", basic_info['Dataset Name'])
-                info_cols[1].metric("Shape", basic_info['Shape'])
-                info_cols[2].metric("Duplicates", basic_info['Duplicate Rows'])
-                info_cols[3].metric("Missing Values", basic_info['Total Missing Values'])
-                
-                # Data Types
-                st.markdown("### 🔧 Data Types")
-                dtype_df = pd.DataFrame(list(current_analysis['dtypes'].items()), 
-                                      columns=['Column', 'Data Type'])
-                st.dataframe(dtype_df, use_container_width=True)
-                
-                # Missing Values Analysis
-                st.markdown("### ⚠️ Missing Values Analysis")
-                missing_df = current_analysis['missing_values']
-                missing_df = missing_df[missing_df['Missing Count'] > 0]
-                if len(missing_df) > 0:
-                    fig = px.bar(missing_df.head(10), 
-                               x=missing_df.index, 
-                               y='Missing Count',
-                               title="Top 10 Columns with Missing Values")
-                    st.plotly_chart(fig, use_container_width=True)
-                    st.dataframe(missing_df, use_container_width=True)
-                else:
-                    st.success("🎉 No missing values found in the dataset!")
-                
-                # Descriptive Statistics
-                st.markdown("### 📊 Descriptive Statistics")
-                st.dataframe(current_analysis['descriptive_stats'], use_container_width=True)
-                
-                # Correlation Matrix
-                if 'correlation' in current_analysis:
-                    st.markdown("### 🔗 Correlation Matrix")
-                    fig = px.imshow(current_analysis['correlation'],
-                                  title="Correlation Heatmap",
-                                  color_continuous_scale='RdBu_r',
-                                  aspect="auto")
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Automated Visualizations
-                st.markdown("### 📈 Automated Visualizations")
-                visualizations = create_visualizations(current_df)
-                for viz in visualizations:
-                    st.plotly_chart(viz, use_container_width=True)
-        
-        # Data Export Options
-        st.markdown("---")
-        st.subheader("📤 Export Options")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            csv_data = current_df.to_csv(index=False).encode()
-            st.download_button(
-                "💾 Download as CSV",
-                data=csv_data,
-                file_name="analyzed_data.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-        
-        with col2:
-            # Summary statistics export
-            if current_analysis:
-                summary_df = current_analysis['descriptive_stats']
-                summary_csv = summary_df.to_csv().encode()
-                st.download_button(
-                    "📊 Download Summary Stats",
-                    data=summary_csv,
-                    file_name="summary_statistics.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
-        
-        with col3:
-            if st.button("🔄 Analyze Another Dataset", use_container_width=True):
-                st.rerun()
+        show_data_preview(current_df, current_key)
+        show_analysis_results(current_df, current_key)
+        show_export_options(current_df, current_key)
 
 # ------------------------------------
 # 🏠 Home Page
@@ -540,6 +1124,8 @@ def show_home():
 # Dashboard Page
 # ------------------------------------
 def show_dashboard():
+    import plotly.graph_objects as go
+    
     st.markdown('<div class="main-header">🧬 Project AEGIS Dashboard</div>', unsafe_allow_html=True)
     
     st.image("https://cdn-icons-png.flaticon.com/512/1081/1081055.png", width=150)
@@ -575,7 +1161,7 @@ def show_dashboard():
         fig.add_trace(go.Scatter(x=trend_data['Month'], y=trend_data['Vitamin D'], name='Vitamin D', line=dict(color='#45B7D1', width=3)))
         fig.update_layout(title="Monthly Biomarker Averages", xaxis_title="Month", yaxis_title="Level", height=400)
         st.plotly_chart(fig, use_container_width=True)
-        st.download_button("📥 Export Data", trend_data.to_csv(index=False).encode(), "biomarker_trends.csv", "text/csv")
+        st.download_button("📥 Export Data", to_csv_bytes(trend_data), "biomarker_trends.csv", "text/csv")
 
     with col2:
         st.subheader("🚀 Quick Actions")
@@ -599,6 +1185,8 @@ def show_dashboard():
 # Genomic Analysis Page
 # ------------------------------------
 def show_genomic_analysis():
+    import plotly.express as px
+    
     st.markdown('<div class="main-header">🧬 Genomic Analysis</div>', unsafe_allow_html=True)
     
     st.image("https://cdn-icons-png.flaticon.com/512/1081/1081055.png", width=150)
@@ -618,7 +1206,7 @@ def show_genomic_analysis():
                      title=f"Variant Frequency by Impact for {gene}", hover_data=['Variant'])
     st.plotly_chart(fig, use_container_width=True)
 
-    st.download_button("📥 Export Variant Data", variants_data.to_csv(index=False).encode(), "variant_data.csv", "text/csv")
+    st.download_button("📥 Export Variant Data", to_csv_bytes(variants_data), "variant_data.csv", "text/csv")
 
 # ------------------------------------
 # Model Training Page
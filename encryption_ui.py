@@ -1,16 +1,23 @@
 import os
 import streamlit as st
-from cryptography.fernet import Fernet
 import hashlib
 
+@st.cache_resource(show_spinner=False)
+def _derived_key(raw_key, salt):
+    """Derive a 32-byte key with scrypt; cached so it runs once per process"""
+    return hashlib.scrypt(raw_key.encode(), salt=salt.encode(), n=2**14, r=8, p=1, dklen=32)
+
 def get_encryption_key():
     """Get encryption key from environment variable"""
     key = os.getenv('ENCRYPTION_KEY')
     if not key:
         st.error("Encryption key not set!")
         st.stop()
-    # Hash the key to ensure it's 32 bytes
-    return hashlib.sha256(key.encode()).digest()
+    salt = os.getenv('ENC_SALT')
+    if not salt:
+        st.error("Encryption salt not set!")
+        st.stop()
+    return _derived_key(key, salt)
 
 def init_session_state():
     """Initialize session state variables"""
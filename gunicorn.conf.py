@@ -0,0 +1,15 @@
+import multiprocessing
+
+# Gunicorn settings for the loading-page server (server:app)
+bind = '0.0.0.0:5000'
+workers = multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = 4
+# Each worker binds its own SO_REUSEPORT socket (gunicorn >= 24) and the kernel
+# spreads connections across them; the master holds no listener in this mode
+reuse_port = True
+
+def when_ready(server):
+    """Start Streamlit once, from the master process, before workers are forked"""
+    from server import start_streamlit
+    start_streamlit()
\ No newline at end of file
@@ -1,11 +1,28 @@
+import atexit
+import gzip
+import hashlib
 import os
-import subprocess
-import threading
+import shutil
+import signal
+import socket
+import tempfile
 import time
-from flask import Flask, render_template_string
+from pathlib import Path
+from flask import Flask, Response, request, send_file
 
 app = Flask(__name__)
 
+STREAMLIT_PORT = 8501
+STREAMLIT_RESTART_DELAY = 1
+# Streamlit sits behind the same proxy as this page (see nginx.conf)
+STREAMLIT_BASE_PATH = 'app'
+STREAMLIT_URL = '/app/'
+
+# Time of the last successful probe; the supervisor can restart Streamlit, so
+# a positive result is only trusted for STREAMLIT_READY_TTL seconds
+STREAMLIT_READY_TTL = 1
+streamlit_ready_at = 0.0
+
 # HTML template for the loading page
 LOADING_PAGE = """
 <!DOCTYPE html>
@@ -48,49 +65,156 @@ LOADING_PAGE = """
         <p><small>This may take a few moments</small></p>
     </div>
     <script>
-        // Redirect to Streamlit after a delay
-        setTimeout(function() {
-            window.location.href = "http://localhost:8501";
-        }, 3000);
-        
-        // Fallback redirect
-        setTimeout(function() {
-            window.location.reload();
-        }, 10000);
+        // Redirect as soon as Streamlit accepts connections
+        setInterval(function() {
+            fetch('/ready').then(function(r) {
+                if (r.ok) window.location.href = "/app/";
+            });
+        }, 200);
     </script>
 </body>
 </html>
 """
 
+def minify_html(html):
+    """Strip indentation, blank lines and whole-line comments from the page"""
+    lines = (line.strip() for line in html.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def compress_variants(body):
+    """Precompress the page for each Content-Encoding we can serve, best first"""
+    variants = {}
+    try:
+        import brotli
+        variants['br'] = brotli.compress(body, quality=11)
+    except ImportError:
+        pass
+    variants['gzip'] = gzip.compress(body, 9)
+    return variants
+
+LOADING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+def remove_loading_dir(path, owner):
+    """Delete the loading-page directory when the process that created it exits"""
+    # Forked gunicorn workers inherit this handler and share the directory
+    if os.getpid() == owner:
+        shutil.rmtree(path, ignore_errors=True)
+
+def write_loading_files(body):
+    """Write the page and its compressed variants to disk, keyed by encoding"""
+    # Served from files so gunicorn can hand them to sendfile(2) instead of copying through Python.
+    # mkdtemp gives a fresh 0700 directory, so no other local user can swap the page or plant links
+    loading_dir = Path(tempfile.mkdtemp(prefix='aegis_loading_'))
+    atexit.register(remove_loading_dir, loading_dir, os.getpid())
+    files = {}
+    for encoding, data in {None: body, **compress_variants(body)}.items():
+        path = loading_dir / ('loading.html' + LOADING_SUFFIXES.get(encoding, ''))
+        path.write_bytes(data)
+        files[encoding] = path
+    return files
+
+# The page has no template variables, so minify, encode and compress it once at import
+LOADING_BYTES = minify_html(LOADING_PAGE).encode('utf-8')
+LOADING_FILES = write_loading_files(LOADING_BYTES)
+LOADING_ETAG = hashlib.md5(LOADING_BYTES).hexdigest()
+# The page lives in this file, so its mtime is the same in every worker
+LOADING_MODIFIED = os.path.getmtime(__file__)
+
+def check_streamlit():
+    """Return True if Streamlit's port accepted a TCP connection within the last STREAMLIT_READY_TTL"""
+    global streamlit_ready_at
+    now = time.monotonic()
+    if now - streamlit_ready_at < STREAMLIT_READY_TTL:
+        return True
+    try:
+        socket.create_connection(('127.0.0.1', STREAMLIT_PORT), timeout=0.05).close()
+    except OSError:
+        streamlit_ready_at = 0.0
+        return False
+    streamlit_ready_at = now
+    return True
+
+@app.route('/ready')
+def ready():
+    """Readiness probe polled by the loading page"""
+    status = 200 if check_streamlit() else 503
+    return Response(status=status, headers={'Cache-Control': 'no-store'})
+
 @app.route('/')
 def index():
-    return render_template_string(LOADING_PAGE)
+    """Serve the precomputed loading page in the best encoding the client accepts"""
+    encodings = [encoding for encoding in LOADING_FILES if encoding]
+    encoding = request.accept_encodings.best_match(encodings)
+    # Each encoding is a different representation, so it gets its own strong ETag
+    etag = f'{LOADING_ETAG}-{encoding}' if encoding else LOADING_ETAG
+    # conditional=True answers If-None-Match / If-Modified-Since with a 304
+    response = send_file(LOADING_FILES[encoding], mimetype='text/html', download_name='loading.html',
+                         conditional=True, etag=etag, last_modified=LOADING_MODIFIED, max_age=60)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Scriptless fallback: go to Streamlit once it is up, else check again shortly
+    response.headers['Refresh'] = f'0; url={STREAMLIT_URL}' if check_streamlit() else '3'
+    return response
 
-def run_streamlit():
-    """Run Streamlit in the background"""
-    # Wait a bit for Flask to start
-    time.sleep(2)
+def stop_streamlit(pid, owner):
+    """Terminate the Streamlit supervisor when the process that started it exits"""
+    # Forked gunicorn workers inherit this handler; only the starter may kill
+    if os.getpid() != owner:
+        return
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+def supervise_streamlit(child_env):
+    """Run Streamlit in its own process group, restarting it whenever it exits"""
+    pgid = None
+    
+    def stop(signum, frame):
+        if pgid is not None:
+            try:
+                os.killpg(pgid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        os._exit(0)
     
-    # Set Streamlit configuration
-    os.environ['STREAMLIT_SERVER_HEADLESS'] = 'true'
-    os.environ['STREAMLIT_SERVER_PORT'] = '8501'
-    os.environ['STREAMLIT_SERVER_ADDRESS'] = '0.0.0.0'
-    os.environ['STREAMLIT_BROWSER_GATHER_USAGE_STATS'] = 'false'
+    # Drop handlers inherited from the parent; gunicorn's SIGCHLD one would reap our child
+    for sig in signal.valid_signals():
+        if callable(signal.getsignal(sig)):
+            signal.signal(sig, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
     
-    # Run Streamlit
-    subprocess.call([
-        'streamlit', 'run', 'app.py',
-        '--server.port=8501',
-        '--server.address=0.0.0.0',
-        '--server.headless=true',
-        '--browser.gatherUsageStats=false'
-    ])
+    while True:
+        # posix_spawn keeps restarts cheap; setsid makes Streamlit a group leader
+        pgid = os.posix_spawnp('streamlit', ['streamlit', 'run', 'app.py'], child_env, setsid=True)
+        os.waitpid(pgid, 0)
+        time.sleep(STREAMLIT_RESTART_DELAY)
 
-if __name__ == '__main__':
-    # Start Streamlit in a separate thread
-    streamlit_thread = threading.Thread(target=run_streamlit)
-    streamlit_thread.daemon = True
-    streamlit_thread.start()
+def start_streamlit():
+    """Start the Streamlit supervisor alongside the loading-page server"""
+    # Streamlit configuration goes to the child only; our own environ is untouched
+    child_env = {
+        **os.environ,
+        'STREAMLIT_SERVER_HEADLESS': 'true',
+        'STREAMLIT_SERVER_PORT': str(STREAMLIT_PORT),
+        'STREAMLIT_SERVER_ADDRESS': '0.0.0.0',
+        'STREAMLIT_SERVER_BASE_URL_PATH': STREAMLIT_BASE_PATH,
+        'STREAMLIT_BROWSER_GATHER_USAGE_STATS': 'false',
+    }
     
-    # Start Flask app
-    app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
+    # A forked supervisor keeps restarts and signal handling out of this process
+    pid = os.fork()
+    if pid == 0:
+        try:
+            supervise_streamlit(child_env)
+        finally:
+            os._exit(1)
+    atexit.register(stop_streamlit, pid, os.getpid())
+
+if __name__ == '__main__':
+    # Serve through gunicorn; its when_ready hook starts Streamlit once
+    # exec skips atexit, so drop this process's loading files now; gunicorn writes its own on import
+    shutil.rmtree(LOADING_FILES[None].parent, ignore_errors=True)
+    os.execvp('gunicorn', ['gunicorn', '--config', 'gunicorn.conf.py', 'server:app'])
\ No newline at end of file